@@ -2,10 +2,13 @@ import sys
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
-from email_service import send_weekly_updates, fetch_new_events
+from email_service import send_weekly_updates, fetch_new_events, filter_events
+import hmac
+import io
 import os
 import json
 from dotenv import load_dotenv
@@ -14,6 +17,8 @@ from broadcast_api import BroadcastAPI
 import pytz
 from dateutil import parser
 from database import init_mongodb
+from metrics import maybe_profile, send_email
+from subscriber_import import parse_subscribers, import_subscribers, render_welcome_email, send_welcome_emails
 
 # Load environment variables
 load_dotenv()
@@ -48,9 +53,11 @@ def init_services():
 
     def scheduled_weekly_update():
         print("Running scheduled weekly update")
-        subscribers = subscribers_collection.find()
-        events = fetch_new_events()  # Replace with actual event fetching logic
-        send_weekly_updates(sendgrid_client, subscribers, events, from_email)
+        # Set PROFILE_WEEKLY_JOB=1 to sample where the run spends its time
+        # Scheduler threads have no app context, which render_template needs
+        with app.app_context(), maybe_profile('weekly_job'):
+            # send_weekly_updates fetches events and queries the collection itself
+            send_weekly_updates(sendgrid_client, subscribers_collection, None, from_email)
 
     print("Adding job to scheduler")
     scheduler.add_job(
@@ -68,6 +75,7 @@ def init_services():
     return client, db, subscribers_collection, sendgrid_client, scheduler
 
 FROM_EMAIL = os.getenv('FROM_EMAIL')
+IMPORT_API_TOKEN = os.getenv('IMPORT_API_TOKEN')
 
 # Initialize all services
 client, db, subscribers_collection, sendgrid_client, scheduler = init_services()
@@ -86,7 +94,7 @@ def send_confirmation_email(to_email):
             subject='Subscription Confirmed - Event Updates',
             html_content=html_content
         )
-        response = sendgrid_client.send(message)
+        response = send_email(sendgrid_client, message)
         print(f"Confirmation email sent to {to_email}. Status Code: {response.status_code}")
         return True
     except Exception as e:
@@ -145,24 +153,7 @@ def subscribe():
 
         # Fetch and send filtered events
         all_events = fetch_new_events()
-        filtered_events = []
-
-        for event in all_events:
-            venue_match = False
-            genre_match = False
-
-            if venues:
-                venue_match = event['venue']['name'] in venues
-            else:
-                venue_match = True
-
-            if genres:
-                genre_match = any(tag in genres for tag in event.get('tags', []))
-            else:
-                genre_match = True
-
-            if venue_match and genre_match:
-                filtered_events.append(event)
+        filtered_events = filter_events(all_events, venues, genres)
 
         if filtered_events:
             html_content = render_template('email_template.html',
@@ -174,7 +165,7 @@ def subscribe():
                 subject='Your First Event Update',
                 html_content=html_content
             )
-            sendgrid_client.send(message)
+            send_email(sendgrid_client, message)
             print(f"First event update sent to {email} with {len(filtered_events)} events")
 
         response_message = 'Subscribed successfully'
@@ -188,6 +179,65 @@ def subscribe():
         return jsonify({'message': f'Error subscribing: {str(e)}'}), 500
 
 
+@app.route('/subscribe/bulk', methods=['POST'])
+def subscribe_bulk():
+    # Bulk import sends email to every address, so it needs a shared secret
+    if not IMPORT_API_TOKEN:
+        return jsonify({'message': 'Bulk import is disabled'}), 403
+    auth_header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(auth_header.encode(), f'Bearer {IMPORT_API_TOKEN}'.encode()):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    if subscribers_collection is None:
+        return jsonify({'message': 'Database connection not available'}), 503
+
+    # Body is either CSV, JSON lines, or a JSON document {"subscribers": [...]}
+    file_format = request.args.get('format')
+    if not file_format:
+        if request.mimetype == 'text/csv':
+            file_format = 'csv'
+        elif request.mimetype == 'application/json':
+            file_format = 'json_body'
+        else:
+            file_format = 'jsonl'
+
+    try:
+        if file_format == 'json_body':
+            data = request.get_json(silent=True)
+            records = data.get('subscribers', []) if isinstance(data, dict) else data
+            if not isinstance(records, list):
+                return jsonify({'message': 'Expected a list of subscribers'}), 400
+            records = [r if isinstance(r, dict) else {} for r in records]
+        else:
+            stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+            records = parse_subscribers(stream, file_format)
+
+        report = import_subscribers(subscribers_collection, records)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Error importing subscribers: {str(e)}'}), 500
+
+    send_welcome = request.args.get('welcome', 'true').lower() != 'false'
+    if report['inserted'] and send_welcome:
+        # Render in the request context, send from a scheduler worker thread
+        html_content = render_welcome_email()
+        scheduler.add_job(
+            send_welcome_emails,
+            args=[sendgrid_client, report['inserted'], FROM_EMAIL, html_content]
+        )
+
+    return jsonify({
+        'message': f"Imported {len(report['inserted'])} of {report['received']} subscribers",
+        'received': report['received'],
+        'inserted': len(report['inserted']),
+        'duplicates': report['duplicates'],
+        'invalid': report['invalid'],
+        'failed': report['failed'],
+        'welcome_emails_queued': bool(report['inserted']) and send_welcome
+    }), 200
+
+
 @app.route('/test-weekly-email/<email>')
 def test_weekly_email(email):
     try:
@@ -217,29 +267,7 @@ def test_weekly_email(email):
                 }
             }), 400
 
-        filtered_events = []
-        for event in all_events:
-            # Initialize match flags
-            venue_match = False
-            genre_match = False
-
-            # Check venue preference
-            if preferred_venues:
-                venue_match = event['venue']['name'] in preferred_venues
-            else:
-                # If no venues specified, any venue is acceptable
-                venue_match = True
-
-            # Check genre preference
-            if preferred_genres:
-                genre_match = any(tag in preferred_genres for tag in event.get('tags', []))
-            else:
-                # If no genres specified, any genre is acceptable
-                genre_match = True
-
-            # Only add event if it matches both venue and genre preferences
-            if venue_match and genre_match:
-                filtered_events.append(event)
+        filtered_events = filter_events(all_events, preferred_venues, preferred_genres)
 
         if not filtered_events:
             return jsonify({
@@ -261,7 +289,7 @@ def test_weekly_email(email):
             subject='Weekly Event Update',
             html_content=html_content
         )
-        response = sendgrid_client.send(message)
+        response = send_email(sendgrid_client, message)
 
         return jsonify({
             'status': 'success',
@@ -278,6 +306,11 @@ def test_weekly_email(email):
         }), 500
 
 
+@app.route('/metrics')
+def metrics():
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+
+
 @app.route('/health')
 def health():
     status = {
@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from typing import Dict
+
+from flask import Flask, render_template
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from benchmarks.fake_sendgrid import FakeSendGridServer
+from benchmarks.synthetic import ROOT_DIR, generate_events, generate_subscribers
+from broadcast_api import BroadcastAPI
+from email_service import filter_recent_events, match_subscriber, send_weekly_updates
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+STAGES = ['ingest', 'date_parse', 'matching', 'rendering', 'send', 'weekly_run']
+FROM_EMAIL = 'benchmark@example.com'
+
+
+@contextmanager
+def timed(results: Dict, stage: str):
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    # Keep the best of repeated runs; it is the least noisy figure
+    results[stage] = min(results.get(stage, elapsed), elapsed)
+
+
+def init_collection(mongo_uri: str = None):
+    """
+    Use a local mongod when a URI is given, otherwise an in-memory mongomock.
+    """
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+
+    db = client['events_bot_benchmark']
+    db.drop_collection('subscribers')
+    subscribers_collection = db['subscribers']
+    subscribers_collection.create_index([('email', 1)], unique=True)
+    return client, subscribers_collection
+
+
+def write_broadcast_cache(events, work_dir: str):
+    """
+    Seed BroadcastAPI's on-disk cache so get_events() never hits the network.
+    The cache expires after an hour, so this is rewritten before each timed
+    read to keep long runs off the real API.
+    """
+    with open(os.path.join(work_dir, 'broadcast_cache.json'), 'w') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'data': events}, f)
+
+
+def run_once(results: Dict, app: Flask, sendgrid_client, subscribers_collection, raw_events, work_dir: str):
+    write_broadcast_cache(raw_events, work_dir)
+    with timed(results, 'ingest'):
+        events = BroadcastAPI().get_upcoming_events()
+
+    with timed(results, 'date_parse'):
+        events = filter_recent_events(events)
+
+    subscribers = list(subscribers_collection.find())
+    with timed(results, 'matching'):
+        matches = []
+        for subscriber in subscribers:
+            filtered_events = match_subscriber(subscriber, events)
+            if filtered_events:
+                matches.append((subscriber['email'], filtered_events))
+
+    with app.app_context():
+        with timed(results, 'rendering'):
+            rendered = [(email, render_template('email_template.html', events=filtered_events, email=email))
+                        for email, filtered_events in matches]
+
+    with timed(results, 'send'):
+        for email, html_content in rendered:
+            message = Mail(
+                from_email=FROM_EMAIL,
+                to_emails=email,
+                subject='Weekly Event Update',
+                html_content=html_content
+            )
+            sendgrid_client.send(message)
+
+    write_broadcast_cache(raw_events, work_dir)
+    with app.app_context():
+        with timed(results, 'weekly_run'):
+            send_weekly_updates(sendgrid_client, subscribers_collection, None, FROM_EMAIL)
+
+    return len(events), len(rendered)
+
+
+def load_baselines() -> Dict:
+    try:
+        with open(BASELINES_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def report(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """
+    Print per-stage timings next to the stored baseline.
+
+    :return: True if any stage is slower than the baseline by more than tolerance.
+    """
+    regressed = False
+    print(f"\n{'stage':<12}{'seconds':>12}{'baseline':>12}{'change':>10}")
+    print('-' * 46)
+    for stage in STAGES:
+        seconds = results[stage]
+        base = baseline.get(stage)
+        if base:
+            change = seconds / base - 1
+            flag = ' REGRESSION' if change > tolerance else ''
+            regressed = regressed or bool(flag)
+            print(f"{stage:<12}{seconds:>12.4f}{base:>12.4f}{change:>+10.1%}{flag}")
+        else:
+            print(f"{stage:<12}{seconds:>12.4f}{'-':>12}{'-':>10}")
+    return regressed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the weekly update pipeline on synthetic data.')
+    arg_parser.add_argument('--events', type=int, default=10000, help='Number of synthetic events')
+    arg_parser.add_argument('--subscribers', type=int, default=1000, help='Number of synthetic subscribers')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the fastest is kept')
+    arg_parser.add_argument('--seed', type=int, default=42)
+    arg_parser.add_argument('--mongo-uri', help='Use a local mongod instead of mongomock')
+    arg_parser.add_argument('--send-latency-ms', type=float, default=0,
+                            help='Artificial latency of the fake SendGrid server')
+    arg_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed slowdown against the baseline before failing')
+    arg_parser.add_argument('--save-baseline', action='store_true',
+                            help='Store these results as the baseline for this configuration')
+    args = arg_parser.parse_args()
+
+    store = 'mongod' if args.mongo_uri else 'mongomock'
+    key = (f"events={args.events},subscribers={args.subscribers},"
+           f"send_latency_ms={args.send_latency_ms:g},store={store}")
+    print(f"Benchmark configuration: {key}")
+
+    app = Flask(__name__, template_folder=os.path.join(ROOT_DIR, 'templates'))
+    client, subscribers_collection = init_collection(args.mongo_uri)
+    subscribers_collection.insert_many(list(generate_subscribers(args.subscribers, seed=args.seed)))
+
+    results = {}
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir, FakeSendGridServer(args.send_latency_ms) as sendgrid_server:
+        raw_events = generate_events(args.events, seed=args.seed)
+        sendgrid_client = SendGridAPIClient('benchmark', host=sendgrid_server.url)
+        os.chdir(work_dir)
+        try:
+            # The app logs every event and email; keep that out of the terminal
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                for _ in range(args.repeat):
+                    event_count, email_count = run_once(results, app, sendgrid_client, subscribers_collection,
+                                                        raw_events, work_dir)
+        finally:
+            os.chdir(original_dir)
+        print(f"{event_count} recent events, {email_count} emails per run, "
+              f"{sendgrid_server.requests} requests to fake SendGrid")
+
+    if args.mongo_uri:
+        client['events_bot_benchmark'].drop_collection('subscribers')
+
+    baselines = load_baselines()
+    regressed = report(results, baselines.get(key, {}), args.tolerance)
+
+    if args.save_baseline:
+        baselines[key] = {stage: round(results[stage], 6) for stage in STAGES}
+        with open(BASELINES_FILE, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINES_FILE}")
+    elif regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
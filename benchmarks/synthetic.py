@@ -0,0 +1,98 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+import pytz
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Exponent of the Zipf-like popularity curve; a handful of venues and tags
+# account for most events, as in the real Broadcast feed.
+SKEW = 1.1
+
+
+def load_vocabulary() -> Dict[str, List[str]]:
+    """
+    Load venue names and tags from the JSON files the frontend uses.
+    """
+    with open(os.path.join(ROOT_DIR, 'venue_names.json'), 'r', encoding='utf-8') as f:
+        venues = [name for name in json.load(f)['venue_names'] if name.strip()]
+    with open(os.path.join(ROOT_DIR, 'distinct_tags.json'), 'r', encoding='utf-8') as f:
+        tags = [tag for tag in json.load(f)['tags'] if tag.strip()]
+    return {'venues': venues, 'tags': tags}
+
+
+def _skewed_weights(count: int, rng: random.Random) -> List[float]:
+    weights = [1 / (rank + 1) ** SKEW for rank in range(count)]
+    # Shuffle so popularity doesn't follow alphabetical order
+    rng.shuffle(weights)
+    return weights
+
+
+def generate_events(count: int, seed: int = 42) -> List[Dict]:
+    """
+    Generate raw events shaped like the Broadcast region payload.
+
+    :param count: Number of events to generate.
+    :param seed: Seed for reproducible output.
+    :return: A list of event dicts as returned by the Broadcast API.
+    """
+    rng = random.Random(seed)
+    vocabulary = load_vocabulary()
+    venues, tags = vocabulary['venues'], vocabulary['tags']
+    venue_weights = _skewed_weights(len(venues), rng)
+    tag_weights = _skewed_weights(len(tags), rng)
+    now = datetime.now(pytz.UTC)
+
+    events = []
+    for i in range(count):
+        venue = rng.choices(venues, weights=venue_weights)[0]
+        # Some events fall before the one-week cutoff and get filtered out
+        start_time = now + timedelta(days=rng.uniform(-14, 60))
+        event_tags = list(dict.fromkeys(rng.choices(tags, weights=tag_weights, k=rng.randint(0, 4))))
+        cover = rng.choice([0, 100, 150, 200, 250, 350])
+        events.append({
+            'id': f'bench-{i}',
+            'name': f'Synthetic event {i}',
+            'venueName': venue,
+            'startTime': start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'coverChargeLabel': f'{cover} kr' if cover else 'Gratis',
+            'tags': event_tags,
+            'custom_fields': {
+                'end_time': (start_time + timedelta(hours=4)).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'age': rng.choice(['18', '20', '23', None]),
+                'soldOut': rng.random() < 0.05,
+                'ticketUrl': f'https://tickets.example.com/{i}',
+                'coverCharge': str(cover)
+            },
+            'place': {
+                'name': venue,
+                'address': f'Gate {rng.randint(1, 99)}',
+                'city': 'Oslo'
+            }
+        })
+    return events
+
+
+def generate_subscribers(count: int, seed: int = 42) -> Iterator[Dict]:
+    """
+    Generate subscriber documents with skewed venue and genre preferences,
+    shaped exactly as /subscribe and the bulk import store them.
+    """
+    rng = random.Random(seed + 1)
+    vocabulary = load_vocabulary()
+    venues, tags = vocabulary['venues'], vocabulary['tags']
+    venue_weights = _skewed_weights(len(venues), rng)
+    tag_weights = _skewed_weights(len(tags), rng)
+
+    for i in range(count):
+        preferred_venues = list(dict.fromkeys(rng.choices(venues, weights=venue_weights, k=rng.randint(0, 5))))
+        preferred_genres = list(dict.fromkeys(rng.choices(tags, weights=tag_weights, k=rng.randint(0, 5))))
+        yield {
+            'email': f'subscriber{i}@example.com',
+            'subscribed_at': datetime.utcnow(),
+            'venues': preferred_venues,
+            'genres': preferred_genres
+        }
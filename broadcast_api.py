@@ -6,6 +6,7 @@ from typing import List, Dict, Optional, Set
 import logging
 import os
 from dotenv import load_dotenv
+from metrics import BROADCAST_CACHE, track_stage
 
 #Load environment variables
 load_dotenv()
@@ -55,13 +56,16 @@ class BroadcastAPI:
         """
         cached_data = self._load_cache()
         if cached_data:
+            BROADCAST_CACHE.labels('hit').inc()
             self.logger.info("Using cached data")
             return cached_data
 
+        BROADCAST_CACHE.labels('miss').inc()
         self.logger.info("Fetching fresh data from API")
-        response = requests.get(self.base_url, headers=self.headers)
-        response.raise_for_status()
-        data = response.json()
+        with track_stage('broadcast_fetch'):
+            response = requests.get(self.base_url, headers=self.headers)
+            response.raise_for_status()
+            data = response.json()
         self._save_cache(data)
         time.sleep(1)  # Be nice to the API
         return data
@@ -98,7 +102,8 @@ class BroadcastAPI:
         Get upcoming events with extracted information
         """
         events = self.get_events()
-        extracted_events = [self.extract_event_info(event) for event in events]
+        with track_stage('broadcast_parse'):
+            extracted_events = [self.extract_event_info(event) for event in events]
 
         if max_events:
             return extracted_events[:max_events]
@@ -4,6 +4,7 @@ from pymongo.errors import ConnectionFailure
 import os
 from dotenv import load_dotenv
 import ssl
+from metrics import MongoCommandListener
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +23,8 @@ def init_mongodb():
             ssl=True,
             ssl_cert_reqs=ssl.CERT_NONE,
             tls=True,
-            tlsAllowInvalidCertificates=True
+            tlsAllowInvalidCertificates=True,
+            event_listeners=[MongoCommandListener()]
         )
         # Test connection
         client.admin.command('ping')
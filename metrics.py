@@ -0,0 +1,223 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import Counter as PrometheusCounter, Gauge, Histogram
+from pymongo import monitoring
+
+STAGE_SECONDS = Histogram(
+    'events_bot_stage_duration_seconds',
+    'Time spent in each pipeline stage',
+    ['stage']
+)
+BROADCAST_CACHE = PrometheusCounter(
+    'events_bot_broadcast_cache_total',
+    'Broadcast event cache lookups',
+    ['result']
+)
+SENDGRID_SECONDS = Histogram(
+    'events_bot_sendgrid_request_duration_seconds',
+    'SendGrid mail send latency',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+SENDGRID_RESPONSES = PrometheusCounter(
+    'events_bot_sendgrid_responses_total',
+    'SendGrid mail send responses by status code',
+    ['status']
+)
+MONGO_SECONDS = Histogram(
+    'events_bot_mongo_command_duration_seconds',
+    'MongoDB command latency',
+    ['command', 'outcome'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+CAMPAIGN_SECONDS = Histogram(
+    'events_bot_campaign_duration_seconds',
+    'Total duration of an email campaign',
+    ['campaign'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+LAST_CAMPAIGN_STAGE_SECONDS = Gauge(
+    'events_bot_last_campaign_stage_seconds',
+    'Time spent per stage in the most recent run of a campaign',
+    ['campaign', 'stage']
+)
+LAST_CAMPAIGN_EMAILS = Gauge(
+    'events_bot_last_campaign_emails',
+    'Email outcomes in the most recent run of a campaign',
+    ['campaign', 'outcome']
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a block of work and record it under the given stage label.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def send_email(sendgrid_client, message):
+    """
+    Send a message through SendGrid, recording latency and status code.
+    Exceptions are counted and re-raised for the caller to handle.
+    """
+    start = time.perf_counter()
+    try:
+        response = sendgrid_client.send(message)
+    except Exception as e:
+        SENDGRID_RESPONSES.labels(str(getattr(e, 'status_code', 'error'))).inc()
+        raise
+    finally:
+        SENDGRID_SECONDS.observe(time.perf_counter() - start)
+    SENDGRID_RESPONSES.labels(str(response.status_code)).inc()
+    return response
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Record the latency and outcome of every MongoDB command.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_SECONDS.labels(event.command_name, 'success').observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_SECONDS.labels(event.command_name, 'failure').observe(event.duration_micros / 1e6)
+
+
+class CampaignTimer:
+    """
+    Accumulate per-stage timings and email outcomes for one campaign run,
+    then publish them as a summary when the run finishes.
+
+    :param campaign: Campaign label, e.g. 'weekly'.
+    :param stages: Stages always reported, as 0 when they didn't occur.
+    :param outcomes: Email outcomes always reported, as 0 when they didn't occur.
+    """
+
+    def __init__(self, campaign: str, stages: Iterable[str] = (), outcomes: Iterable[str] = ()):
+        self.campaign = campaign
+        self.known_stages = list(stages)
+        self.known_outcomes = list(outcomes)
+        self.started_at = datetime.utcnow()
+        self.stages = defaultdict(float)
+        self.emails = Counter()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            with track_stage(stage):
+                yield
+        finally:
+            self.stages[stage] += time.perf_counter() - start
+
+    def count(self, outcome: str):
+        self.emails[outcome] += 1
+
+    def finish(self) -> Dict:
+        total = time.perf_counter() - self._start
+        CAMPAIGN_SECONDS.labels(self.campaign).observe(total)
+        # Overwrite every known label so nothing is left over from the previous run
+        for stage in set(self.known_stages) | set(self.stages):
+            LAST_CAMPAIGN_STAGE_SECONDS.labels(self.campaign, stage).set(self.stages.get(stage, 0))
+        for outcome in set(self.known_outcomes) | set(self.emails):
+            LAST_CAMPAIGN_EMAILS.labels(self.campaign, outcome).set(self.emails.get(outcome, 0))
+
+        summary = {
+            'campaign': self.campaign,
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': round(total, 3),
+            'stages': {stage: round(seconds, 3) for stage, seconds in self.stages.items()},
+            'emails': dict(self.emails)
+        }
+        print(f"Campaign summary: {summary}")
+        return summary
+
+
+class SamplingProfiler:
+    """
+    Periodically sample the stack of one thread and count identical stacks.
+    Output is in collapsed-stack format, readable by flamegraph tools.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005, thread_id: Optional[int] = None):
+        self.interval_seconds = interval_seconds
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, output_file: str):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 15):
+        """
+        Return the functions that were on top of the stack most often.
+        """
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+@contextmanager
+def maybe_profile(name: str):
+    """
+    Sample the current thread while the block runs if PROFILE_<NAME> is set.
+    Interval and output directory come from PROFILE_INTERVAL_MS and
+    PROFILE_OUTPUT_DIR.
+    """
+    if os.getenv(f'PROFILE_{name.upper()}', '').lower() not in ('1', 'true', 'yes'):
+        yield
+        return
+
+    profiler = SamplingProfiler(float(os.getenv('PROFILE_INTERVAL_MS', '5')) / 1000)
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        output_dir = os.getenv('PROFILE_OUTPUT_DIR', 'profiles')
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, f"{name}_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.folded")
+        profiler.write(output_file)
+        total = sum(profiler.samples.values())
+        print(f"Profile of {name} written to {output_file} ({total} samples)")
+        for function, count in profiler.top_functions():
+            print(f"  {count / total:6.1%}  {function}")
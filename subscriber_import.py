@@ -0,0 +1,241 @@
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from dotenv import load_dotenv
+from flask import Flask, render_template
+from pymongo.errors import BulkWriteError
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from database import init_mongodb
+from metrics import send_email
+
+# Load environment variables
+load_dotenv()
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+DUPLICATE_KEY_ERROR = 11000
+
+# Documents per insert_many call
+INSERT_BATCH_SIZE = 1000
+# SendGrid accepts at most 1000 personalizations per request
+SEND_BATCH_SIZE = 1000
+
+WELCOME_SUBJECT = 'Subscription Confirmed - Event Updates'
+
+
+def _split_list(value) -> List[str]:
+    """
+    Normalise a venues/genres field into a list of strings.
+    CSV cells use ';' as separator, JSON may already hold a list.
+    """
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(';') if item.strip()]
+
+
+def parse_csv(stream: TextIO) -> Iterator[Dict]:
+    """
+    Stream subscriber records from CSV with an 'email' column and
+    optional 'venues' and 'genres' columns.
+    """
+    for row in csv.DictReader(stream):
+        yield row
+
+
+def parse_json_lines(stream: TextIO) -> Iterator[Dict]:
+    """
+    Stream subscriber records from JSON lines, one object per line.
+    Lines that are not valid JSON objects are yielded as empty records
+    so they get reported as invalid.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = {}
+        yield record if isinstance(record, dict) else {}
+
+
+def parse_subscribers(stream: TextIO, file_format: str) -> Iterator[Dict]:
+    if file_format == 'csv':
+        return parse_csv(stream)
+    if file_format in ('jsonl', 'ndjson', 'json'):
+        return parse_json_lines(stream)
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def import_subscribers(subscribers_collection, records: Iterable[Dict],
+                       batch_size: int = INSERT_BATCH_SIZE) -> Dict:
+    """
+    Validate, dedupe and insert subscriber records in unordered batches.
+
+    Duplicates inside the import are dropped in memory; duplicates of
+    existing subscribers are rejected by the unique email index and
+    reported without failing the rest of the batch. Emails are stripped
+    and lowercased before they are compared and stored.
+
+    :param subscribers_collection: MongoDB subscribers collection.
+    :param records: Iterable of dicts with 'email', 'venues' and 'genres'.
+    :param batch_size: Number of documents per insert_many call.
+    :return: A report with counts and the inserted, duplicate and invalid emails.
+    """
+    report = {
+        'received': 0,
+        'inserted': [],
+        'duplicates': [],
+        'invalid': [],
+        'failed': []
+    }
+    seen = set()
+    batch = []
+
+    for record in records:
+        report['received'] += 1
+        email = record.get('email')
+        if not isinstance(email, str) or not EMAIL_PATTERN.match(email.strip()):
+            report['invalid'].append('' if email is None else str(email))
+            continue
+        # Store the normalised address so dedupe and the unique email index agree
+        email = email.strip().lower()
+
+        if email in seen:
+            report['duplicates'].append(email)
+            continue
+        seen.add(email)
+
+        batch.append({
+            'email': email,
+            'subscribed_at': datetime.utcnow(),
+            'venues': _split_list(record.get('venues')),
+            'genres': _split_list(record.get('genres'))
+        })
+        if len(batch) >= batch_size:
+            _insert_batch(subscribers_collection, batch, report)
+            batch = []
+
+    if batch:
+        _insert_batch(subscribers_collection, batch, report)
+
+    print(f"Imported {len(report['inserted'])} of {report['received']} subscribers "
+          f"({len(report['duplicates'])} duplicates, {len(report['invalid'])} invalid, "
+          f"{len(report['failed'])} failed)")
+    return report
+
+
+def _insert_batch(subscribers_collection, batch: List[Dict], report: Dict):
+    rejected = {}
+    try:
+        subscribers_collection.insert_many(batch, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            rejected[error['index']] = error.get('code')
+    except Exception as e:
+        # Without per-row errors we can't tell what was written; report the batch as failed
+        print(f"Error inserting batch of {len(batch)} subscribers: {str(e)}")
+        report['failed'].extend(subscriber['email'] for subscriber in batch)
+        return
+
+    for index, subscriber in enumerate(batch):
+        if index not in rejected:
+            report['inserted'].append(subscriber['email'])
+        elif rejected[index] == DUPLICATE_KEY_ERROR:
+            report['duplicates'].append(subscriber['email'])
+        else:
+            report['failed'].append(subscriber['email'])
+
+
+def render_welcome_email() -> str:
+    """
+    Render the confirmation email once; it has no per-recipient content.
+    Must be called inside a Flask app context.
+    """
+    return render_template('subscription_confirmation.html')
+
+
+def send_welcome_emails(sendgrid_client, emails: List[str], from_email: str,
+                        html_content: str, batch_size: int = SEND_BATCH_SIZE) -> int:
+    """
+    Send the confirmation email to many subscribers, one SendGrid request
+    per batch. Each recipient gets their own personalization, so nobody
+    sees the other addresses.
+
+    :return: Number of recipients in batches SendGrid accepted.
+    """
+    sent = 0
+    for start in range(0, len(emails), batch_size):
+        batch = emails[start:start + batch_size]
+        message = Mail(
+            from_email=from_email,
+            to_emails=batch,
+            subject=WELCOME_SUBJECT,
+            html_content=html_content,
+            is_multiple=True
+        )
+        try:
+            response = send_email(sendgrid_client, message)
+            sent += len(batch)
+            print(f"Welcome emails sent to {len(batch)} subscribers. Status Code: {response.status_code}")
+        except Exception as e:
+            print(f"Error sending welcome email batch starting at {start}: {str(e)}")
+    return sent
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Bulk import subscribers from CSV or JSON lines.')
+    arg_parser.add_argument('path', help="File to import, or '-' for stdin")
+    arg_parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Input format (defaults to the file extension)')
+    arg_parser.add_argument('--batch-size', type=int, default=INSERT_BATCH_SIZE,
+                            help='Documents per insert batch')
+    arg_parser.add_argument('--no-welcome', action='store_true',
+                            help='Do not send welcome emails to imported subscribers')
+    args = arg_parser.parse_args()
+
+    file_format = args.format
+    if not file_format:
+        file_format = 'csv' if args.path.lower().endswith('.csv') else 'jsonl'
+
+    mongodb_result = init_mongodb()
+    if mongodb_result is None:
+        print("Failed to initialize MongoDB. Exiting.")
+        sys.exit(1)
+    _, _, subscribers_collection = mongodb_result
+
+    if args.path == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    else:
+        stream = open(args.path, 'r', encoding='utf-8', newline='')
+    with stream:
+        report = import_subscribers(subscribers_collection,
+                                    parse_subscribers(stream, file_format),
+                                    batch_size=args.batch_size)
+
+    for email in report['duplicates']:
+        print(f"Duplicate: {email}")
+    for email in report['invalid']:
+        print(f"Invalid: {email!r}")
+
+    if report['inserted'] and not args.no_welcome:
+        template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
+        app = Flask(__name__, template_folder=template_dir)
+        with app.app_context():
+            html_content = render_welcome_email()
+        sendgrid_client = SendGridAPIClient(os.getenv('SENDGRID_API_KEY'))
+        send_welcome_emails(sendgrid_client, report['inserted'], os.getenv('FROM_EMAIL'), html_content)
+
+
+if __name__ == '__main__':
+    main()